@@ -11,39 +11,66 @@ import traceback
 import gc
 import re
 import base64
+import contextlib
+import fcntl
+import functools
+import gzip
+import hashlib
+import multiprocessing
+import uuid
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, request, jsonify, send_file, Response
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
-import openai
-from openai import OpenAI
 import PyPDF2
-import pdfplumber
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor
 import io
-from pdf2image import convert_from_path
 import fitz  # PyMuPDF
 
+# pdfplumber and pdf2image are imported where first needed - they are only
+# used on fallback paths and add noticeably to worker startup time and RSS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 
-# Initialize OpenAI client
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify backed by orjson - analysis results carry large base64 page images"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson:
+    app.json = OrjsonProvider(app)
+
+# Check OpenAI configuration
 openai_api_key = os.getenv('OPENAI_API_KEY')
 if not openai_api_key:
     print("❌ ERROR: OPENAI_API_KEY environment variable not found!")
     exit(1)
 
-try:
-    client = OpenAI(api_key=openai_api_key)
-    print("✅ OpenAI client initialized successfully")
-except Exception as e:
-    print(f"❌ ERROR initializing OpenAI client: {e}")
-    exit(1)
-
 print("🏠 Enhanced Mortgage Package Processor with Page Preview - 2025-01-09")
 
 # Enhanced HTML template with page preview functionality
@@ -55,574 +82,7 @@ HTML_TEMPLATE = """
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🏠 Mortgage Package Processor | Complete End-to-End Solution</title>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        :root {
-            --primary-color: #2563eb;
-            --primary-dark: #1d4ed8;
-            --secondary-color: #64748b;
-            --success-color: #059669;
-            --warning-color: #d97706;
-            --error-color: #dc2626;
-            --background-gradient: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            --card-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
-            --border-radius: 16px;
-            --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: var(--background-gradient);
-            min-height: 100vh;
-            color: #1f2937;
-            line-height: 1.6;
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-
-        .header {
-            text-align: center;
-            margin-bottom: 3rem;
-            color: white;
-        }
-
-        .header h1 {
-            font-size: 3rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            text-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }
-
-        .header p {
-            font-size: 1.25rem;
-            opacity: 0.9;
-            font-weight: 400;
-        }
-
-        .main-card {
-            background: white;
-            border-radius: var(--border-radius);
-            box-shadow: var(--card-shadow);
-            overflow: hidden;
-            margin-bottom: 2rem;
-        }
-
-        .upload-section {
-            padding: 3rem;
-            text-align: center;
-            border-bottom: 1px solid #e5e7eb;
-        }
-
-        .upload-area {
-            border: 3px dashed #d1d5db;
-            border-radius: var(--border-radius);
-            padding: 3rem;
-            transition: var(--transition);
-            cursor: pointer;
-            background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%);
-        }
-
-        .upload-area:hover {
-            border-color: var(--primary-color);
-            background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%);
-        }
-
-        .upload-area.dragover {
-            border-color: var(--primary-color);
-            background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%);
-            transform: scale(1.02);
-        }
-
-        .upload-icon {
-            font-size: 4rem;
-            color: var(--primary-color);
-            margin-bottom: 1rem;
-        }
-
-        .upload-text {
-            font-size: 1.25rem;
-            font-weight: 600;
-            color: #374151;
-            margin-bottom: 0.5rem;
-        }
-
-        .upload-subtext {
-            color: #6b7280;
-            font-size: 1rem;
-        }
-
-        .processing-section {
-            display: none;
-            padding: 3rem;
-        }
-
-        .processing-header {
-            text-align: center;
-            margin-bottom: 2rem;
-        }
-
-        .processing-header h2 {
-            font-size: 2rem;
-            font-weight: 700;
-            color: #1f2937;
-            margin-bottom: 0.5rem;
-        }
-
-        .processing-steps {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 3rem;
-        }
-
-        .step-card {
-            background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%);
-            border-radius: var(--border-radius);
-            padding: 1.5rem;
-            border: 2px solid #e5e7eb;
-            transition: var(--transition);
-            text-align: center;
-        }
-
-        .step-card.active {
-            border-color: var(--primary-color);
-            background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%);
-            transform: translateY(-4px);
-            box-shadow: 0 8px 25px -8px var(--primary-color);
-        }
-
-        .step-card.completed {
-            border-color: var(--success-color);
-            background: linear-gradient(135deg, #ecfdf5 0%, #d1fae5 100%);
-        }
-
-        .step-number {
-            width: 40px;
-            height: 40px;
-            border-radius: 50%;
-            background: var(--primary-color);
-            color: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: 600;
-            margin: 0 auto 1rem;
-        }
-
-        .step-card.completed .step-number {
-            background: var(--success-color);
-        }
-
-        .step-title {
-            font-size: 1rem;
-            font-weight: 600;
-            color: #1f2937;
-            margin-bottom: 0.5rem;
-        }
-
-        .step-description {
-            color: #6b7280;
-            font-size: 0.875rem;
-        }
-
-        /* NEW: Lender Requirement Page Preview Section */
-        .requirement-page-preview {
-            background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
-            border-radius: var(--border-radius);
-            padding: 2rem;
-            margin-bottom: 2rem;
-            border: 2px solid #0ea5e9;
-            display: none;
-        }
-
-        .requirement-page-preview h3 {
-            color: #0c4a6e;
-            font-size: 1.5rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .requirement-page-preview p {
-            color: #0c4a6e;
-            margin-bottom: 1.5rem;
-            font-size: 1rem;
-        }
-
-        .page-preview-container {
-            background: white;
-            border-radius: 12px;
-            padding: 1rem;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-            text-align: center;
-        }
-
-        .page-preview-image {
-            max-width: 100%;
-            height: auto;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            cursor: pointer;
-            transition: var(--transition);
-        }
-
-        .page-preview-image:hover {
-            transform: scale(1.02);
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.15);
-        }
-
-        .page-info {
-            margin-top: 1rem;
-            color: #6b7280;
-            font-size: 0.875rem;
-        }
-
-        /* Modal for full-size page view */
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.8);
-        }
-
-        .modal-content {
-            position: relative;
-            margin: 2% auto;
-            width: 90%;
-            max-width: 800px;
-            background: white;
-            border-radius: var(--border-radius);
-            padding: 2rem;
-        }
-
-        .modal-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-        }
-
-        .modal-title {
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #1f2937;
-        }
-
-        .close {
-            font-size: 2rem;
-            font-weight: bold;
-            cursor: pointer;
-            color: #6b7280;
-        }
-
-        .close:hover {
-            color: #1f2937;
-        }
-
-        .modal-image {
-            width: 100%;
-            height: auto;
-            border-radius: 8px;
-        }
-
-        .package-preview {
-            background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%);
-            border-radius: var(--border-radius);
-            padding: 2rem;
-            margin-bottom: 2rem;
-            border: 2px solid #9ca3af;
-        }
-
-        .package-preview h3 {
-            color: #374151;
-            font-size: 1.5rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .package-info {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1rem;
-            margin-bottom: 1.5rem;
-        }
-
-        .info-item {
-            background: white;
-            padding: 1rem;
-            border-radius: 8px;
-            border: 1px solid #d1d5db;
-        }
-
-        .info-label {
-            font-size: 0.875rem;
-            color: #6b7280;
-            font-weight: 500;
-            margin-bottom: 0.25rem;
-        }
-
-        .info-value {
-            font-size: 1rem;
-            color: #1f2937;
-            font-weight: 600;
-        }
-
-        .priority-sections {
-            background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%);
-            border-radius: var(--border-radius);
-            padding: 2rem;
-            margin-bottom: 2rem;
-            border: 2px solid #f59e0b;
-        }
-
-        .priority-sections h3 {
-            color: #92400e;
-            font-size: 1.5rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .document-checklist {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 1rem;
-        }
-
-        .document-item {
-            background: white;
-            border-radius: 8px;
-            padding: 1rem;
-            border: 2px solid #e5e7eb;
-            transition: var(--transition);
-            cursor: pointer;
-        }
-
-        .document-item:hover {
-            border-color: var(--primary-color);
-        }
-
-        .document-item.checked {
-            border-color: var(--success-color);
-            background: linear-gradient(135deg, #ecfdf5 0%, #d1fae5 100%);
-        }
-
-        .document-checkbox {
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-        }
-
-        .document-checkbox input[type="checkbox"] {
-            width: 20px;
-            height: 20px;
-            accent-color: var(--success-color);
-        }
-
-        .document-name {
-            font-weight: 500;
-            color: #374151;
-            flex: 1;
-        }
-
-        .email-section {
-            background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%);
-            border-radius: var(--border-radius);
-            padding: 2rem;
-            margin-bottom: 2rem;
-            border: 2px solid var(--primary-color);
-        }
-
-        .email-section h3 {
-            color: var(--primary-dark);
-            font-size: 1.5rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .email-input {
-            width: 100%;
-            padding: 1rem;
-            border: 2px solid #e5e7eb;
-            border-radius: 8px;
-            font-size: 1rem;
-            transition: var(--transition);
-        }
-
-        .email-input:focus {
-            outline: none;
-            border-color: var(--primary-color);
-            box-shadow: 0 0 0 3px rgba(37, 99, 235, 0.1);
-        }
-
-        .action-buttons {
-            display: flex;
-            gap: 1rem;
-            justify-content: center;
-            flex-wrap: wrap;
-            margin-top: 2rem;
-        }
-
-        .btn {
-            padding: 1rem 2rem;
-            border: none;
-            border-radius: 12px;
-            font-size: 1rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: var(--transition);
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            font-family: inherit;
-            text-decoration: none;
-            min-width: 200px;
-            justify-content: center;
-        }
-
-        .btn-primary {
-            background: linear-gradient(135deg, var(--primary-color) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 14px 0 rgba(37, 99, 235, 0.3);
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px 0 rgba(37, 99, 235, 0.4);
-        }
-
-        .btn-success {
-            background: linear-gradient(135deg, var(--success-color) 0%, #047857 100%);
-            color: white;
-            box-shadow: 0 4px 14px 0 rgba(5, 150, 105, 0.3);
-        }
-
-        .btn-success:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px 0 rgba(5, 150, 105, 0.4);
-        }
-
-        .btn:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none !important;
-        }
-
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 2rem;
-        }
-
-        .spinner {
-            width: 50px;
-            height: 50px;
-            border: 4px solid #f3f4f6;
-            border-top: 4px solid var(--primary-color);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 1rem;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        .loading-text {
-            font-size: 1.125rem;
-            color: #6b7280;
-            font-weight: 500;
-        }
-
-        .alert {
-            padding: 1.25rem 1.5rem;
-            border-radius: 12px;
-            margin-bottom: 1.5rem;
-            border-left: 4px solid;
-            font-weight: 500;
-        }
-
-        .alert-success {
-            background: linear-gradient(135deg, #ecfdf5 0%, #d1fae5 100%);
-            border-left-color: var(--success-color);
-            color: #065f46;
-        }
-
-        .alert-error {
-            background: linear-gradient(135deg, #fef2f2 0%, #fecaca 100%);
-            border-left-color: var(--error-color);
-            color: #991b1b;
-        }
-
-        .alert-info {
-            background: linear-gradient(135deg, #eff6ff 0%, #dbeafe 100%);
-            border-left-color: var(--primary-color);
-            color: #1e40af;
-        }
-
-        .footer {
-            text-align: center;
-            padding: 2rem;
-            color: white;
-            opacity: 0.8;
-        }
-
-        @media (max-width: 768px) {
-            .container {
-                padding: 1rem;
-            }
-            
-            .header h1 {
-                font-size: 2rem;
-            }
-            
-            .processing-steps {
-                grid-template-columns: repeat(2, 1fr);
-            }
-            
-            .document-checklist {
-                grid-template-columns: 1fr;
-            }
-            
-            .action-buttons {
-                flex-direction: column;
-            }
-            
-            .btn {
-                min-width: auto;
-            }
-
-            .modal-content {
-                width: 95%;
-                margin: 5% auto;
-                padding: 1rem;
-            }
-        }
-    </style>
+    <link href="/static/app.css?v=__ASSET_VERSION__" rel="stylesheet">
 </head>
 <body>
     <div class="container">
@@ -678,7 +138,7 @@ HTML_TEMPLATE = """
                 <!-- Loading -->
                 <div class="loading" id="processing-loading">
                     <div class="spinner"></div>
-                    <div class="loading-text">Analyzing mortgage package...</div>
+                    <div class="loading-text" id="loading-text">Analyzing mortgage package...</div>
                 </div>
 
                 <!-- Package Preview -->
@@ -766,347 +226,193 @@ HTML_TEMPLATE = """
         </div>
     </div>
 
-    <script>
-        // Global state
-        let uploadedFile = null;
-        let extractedRequirements = null;
-        let currentStep = 1;
-
-        // File upload handling
-        function setupFileUpload() {
-            const uploadArea = document.getElementById('upload-area');
-            const fileInput = document.getElementById('file-input');
-
-            // Drag and drop
-            uploadArea.addEventListener('dragover', (e) => {
-                e.preventDefault();
-                uploadArea.classList.add('dragover');
-            });
-
-            uploadArea.addEventListener('dragleave', () => {
-                uploadArea.classList.remove('dragover');
-            });
-
-            uploadArea.addEventListener('drop', (e) => {
-                e.preventDefault();
-                uploadArea.classList.remove('dragover');
-                const files = e.dataTransfer.files;
-                if (files.length > 0) {
-                    handleFile(files[0]);
-                }
-            });
-        }
-
-        function handleFileUpload(event) {
-            const file = event.target.files[0];
-            if (file) {
-                handleFile(file);
-            }
-        }
-
-        function handleFile(file) {
-            if (file.type !== 'application/pdf') {
-                alert('Please upload a PDF file.');
-                return;
-            }
+    <script src="/static/app.js?v=__ASSET_VERSION__" defer></script>
+</body>
+</html>
+"""
 
-            uploadedFile = file;
-            
-            // Update package preview
-            updatePackagePreview(file);
-            
-            // Hide upload section and show processing
-            document.getElementById('upload-section').style.display = 'none';
-            document.getElementById('processing-section').style.display = 'block';
-            
-            // Start processing
-            processPackage();
-        }
-
-        function updatePackagePreview(file) {
-            document.getElementById('file-name').textContent = file.name;
-            document.getElementById('file-size').textContent = formatFileSize(file.size);
-            document.getElementById('package-preview').style.display = 'block';
-        }
-
-        function formatFileSize(bytes) {
-            if (bytes === 0) return '0 Bytes';
-            const k = 1024;
-            const sizes = ['Bytes', 'KB', 'MB', 'GB'];
-            const i = Math.floor(Math.log(bytes) / Math.log(k));
-            return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
-        }
-
-        async function processPackage() {
-            try {
-                // Step 1: Scan Package
-                updateStep(1, 'active');
-                document.getElementById('processing-loading').style.display = 'block';
-                
-                // Upload and analyze file
-                const formData = new FormData();
-                formData.append('file', uploadedFile);
-                
-                const response = await fetch('/analyze_package', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    updateStep(1, 'completed');
-                    updateStep(2, 'active');
-                    
-                    // Update package info
-                    document.getElementById('total-pages').textContent = result.total_pages || 'Unknown';
-                    document.getElementById('instructions-found').textContent = result.page_number ? `Page ${result.page_number}` : 'Not detected';
-                    
-                    // NEW: Show requirement page preview if available
-                    if (result.page_image) {
-                        showRequirementPagePreview(result.page_image, result.page_number);
-                    }
-                    
-                    // Step 2: Extract Requirements
-                    extractedRequirements = result;
-                    displayRequirements(result);
-                    
-                    updateStep(2, 'completed');
-                    updateStep(3, 'active');
-                    
-                    document.getElementById('processing-loading').style.display = 'none';
-                    
-                } else {
-                    throw new Error(result.error || 'Failed to analyze package');
-                }
-                
-            } catch (error) {
-                console.error('Processing error:', error);
-                document.getElementById('processing-loading').style.display = 'none';
-                showAlert('Error processing package: ' + error.message, 'error');
-            }
-        }
-
-        // NEW: Show requirement page preview
-        function showRequirementPagePreview(pageImageBase64, pageNumber) {
-            const previewSection = document.getElementById('requirement-page-preview');
-            const previewImage = document.getElementById('requirement-page-image');
-            const pageNumberSpan = document.getElementById('requirement-page-number');
-            const modalImage = document.getElementById('modal-image');
-            
-            // Set the image source
-            const imageDataUrl = `data:image/png;base64,${pageImageBase64}`;
-            previewImage.src = imageDataUrl;
-            modalImage.src = imageDataUrl;
+# Assets referenced by the dashboard shell, with the type each is served as
+STATIC_ASSETS = {'app.css': 'text/css', 'app.js': 'text/javascript'}
+# Versioned asset URLs change whenever the content does, so they can be cached for a year
+STATIC_ASSET_MAX_AGE = 365 * 24 * 3600
+
+def load_static_assets():
+    """Raw bytes of the dashboard's static assets"""
+    assets = {}
+    for asset in STATIC_ASSETS:
+        with open(os.path.join(app.static_folder, asset), 'rb') as f:
+            assets[asset] = f.read()
+    return assets
+
+def get_asset_version(assets):
+    """Content hash of the static assets, used to bust long-lived browser caches"""
+    digest = hashlib.sha256()
+    for data in assets.values():
+        digest.update(data)
+    return digest.hexdigest()[:12]
+
+# The dashboard is static - encode and compress it once at startup
+STATIC_ASSET_BYTES = load_static_assets()
+ASSET_VERSION = get_asset_version(STATIC_ASSET_BYTES)
+INDEX_HTML = HTML_TEMPLATE.replace('__ASSET_VERSION__', ASSET_VERSION).encode('utf-8')
+INDEX_ETAG = hashlib.sha256(INDEX_HTML).hexdigest()[:16]
+INDEX_GZIP = gzip.compress(INDEX_HTML, compresslevel=9)
+INDEX_BR = brotli.compress(INDEX_HTML, quality=11) if brotli else None
+STATIC_GZIP = {asset: gzip.compress(data, compresslevel=9) for asset, data in STATIC_ASSET_BYTES.items()}
+STATIC_BR = {asset: brotli.compress(data, quality=11) for asset, data in STATIC_ASSET_BYTES.items()} if brotli else None
+
+# Optional page-level text extraction pool - PDF parsing is CPU-bound, so it uses
+# processes. Off by default: every gunicorn worker would own a forkserver plus
+# PAGE_WORKERS children each importing this module, which a small instance cannot
+# afford, and the serial path stops at the funding page while the pool parses
+# every scanned page. Set PAGE_WORKERS above 1 on hosts with memory to spare.
+PAGE_WORKERS = int(os.environ.get('PAGE_WORKERS', 1))
+
+page_executor = None
+page_executor_lock = threading.Lock()
+
+def get_page_executor():
+    """Shared page extraction pool, started on first use.
+    
+    Children come from a forkserver - forking a threaded gunicorn worker from an
+    analysis thread can leave locks held by other threads stuck in the child.
+    """
+    global page_executor
+    with page_executor_lock:
+        if page_executor is None:
+            page_executor = ProcessPoolExecutor(
+                max_workers=PAGE_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver')
+            )
+        return page_executor
+
+def discard_page_executor(executor):
+    """Drop a pool whose child died so the next analysis starts a fresh one"""
+    global page_executor
+    with page_executor_lock:
+        if page_executor is executor:
+            page_executor = None
+    executor.shutdown(wait=False)
+
+# Below this many pages the pickling/IPC round trip costs more than it saves
+PARALLEL_MIN_PAGES = int(os.environ.get('PARALLEL_MIN_PAGES', 4))
+
+# Funding instructions fit on a page many times over; longer text layers are
+# scanner noise and are cut before any matching runs over them
+MAX_PAGE_TEXT_CHARS = 50000
+
+def iter_pages_text_serial(pdf_path, page_numbers):
+    """Yield (page_num, text) one page at a time, opening each PDF backend at most once.
+    
+    pdfplumber is only opened when PyPDF2 first comes back empty, so a caller that
+    stops after the first page never pays for pages it did not look at.
+    """
+    page_numbers = list(page_numbers)
+    
+    with contextlib.ExitStack() as stack:
+        try:
+            pdf_reader = PyPDF2.PdfReader(stack.enter_context(open(pdf_path, 'rb')))
+            page_count = len(pdf_reader.pages)
+        except:
+            pdf_reader = None
+        plumber_pages = None
+        
+        for i, page_num in enumerate(page_numbers):
+            page_text = ""
+            try:
+                if pdf_reader is not None and page_num < page_count:
+                    page_text = pdf_reader.pages[page_num].extract_text() or ""
+            except:
+                pass
             
-            // Set page number
-            pageNumberSpan.textContent = pageNumber || 'Unknown';
+            if not page_text.strip():
+                try:
+                    if plumber_pages is None:
+                        import pdfplumber
+                        # Only load the pages that may still need text, not the whole document
+                        pdf = stack.enter_context(pdfplumber.open(pdf_path, pages=[p + 1 for p in page_numbers[i:]]))
+                        plumber_pages = {page.page_number - 1: page for page in pdf.pages}
+                    page = plumber_pages.get(page_num)
+                    if page is not None:
+                        page_text = page.extract_text() or ""
+                        page.close()
+                except:
+                    if plumber_pages is None:
+                        plumber_pages = {}  # pdfplumber cannot read this file - don't retry per page
             
-            // Show the preview section
-            previewSection.style.display = 'block';
-        }
-
-        // Modal functions
-        function openModal() {
-            document.getElementById('page-modal').style.display = 'block';
-        }
-
-        function closeModal() {
-            document.getElementById('page-modal').style.display = 'none';
-        }
-
-        // Close modal when clicking outside
-        window.onclick = function(event) {
-            const modal = document.getElementById('page-modal');
-            if (event.target === modal) {
-                modal.style.display = 'none';
-            }
-        }
+            yield page_num, page_text[:MAX_PAGE_TEXT_CHARS] if page_text.strip() else ""
 
-        function updateStep(stepNumber, status) {
-            const step = document.getElementById(`step-${stepNumber}`);
-            step.classList.remove('active', 'completed');
-            if (status) {
-                step.classList.add(status);
-            }
-        }
+def extract_pages_text_batch(pdf_path, page_numbers):
+    """Extract text from several pages, opening each PDF backend once"""
+    return dict(iter_pages_text_serial(pdf_path, page_numbers))
 
-        function displayRequirements(result) {
-            // Show priority sections
-            const prioritySection = document.getElementById('priority-sections');
-            const checklistContainer = document.getElementById('document-checklist');
-            
-            let checklistHTML = '';
-            
-            if (result.requirements && result.requirements.length > 0) {
-                result.requirements.forEach((req, index) => {
-                    checklistHTML += `
-                        <div class="document-item" onclick="toggleDocument(${index})">
-                            <div class="document-checkbox">
-                                <input type="checkbox" id="doc-${index}" onchange="checkDocument(${index})">
-                                <label for="doc-${index}" class="document-name">${req}</label>
-                            </div>
-                        </div>
-                    `;
-                });
-            } else {
-                checklistHTML = `
-                    <div class="document-item">
-                        <div class="document-checkbox">
-                            <input type="checkbox" id="doc-complete" onchange="checkDocument('complete')">
-                            <label for="doc-complete" class="document-name">Complete Package (No specific breakdown required)</label>
-                        </div>
-                    </div>
-                `;
-            }
-            
-            checklistContainer.innerHTML = checklistHTML;
-            prioritySection.style.display = 'block';
-            
-            // Show email section
-            const emailSection = document.getElementById('email-section');
-            const emailInput = document.getElementById('return-email');
-            
-            if (result.return_email) {
-                emailInput.value = result.return_email;
-            }
-            
-            emailSection.style.display = 'block';
-            
-            // Show action buttons
-            document.getElementById('action-buttons').style.display = 'flex';
-            
-            // Enable email validation
-            emailInput.addEventListener('input', validateForm);
-        }
-
-        function toggleDocument(index) {
-            const checkbox = document.getElementById(`doc-${index}`);
-            checkbox.checked = !checkbox.checked;
-            checkDocument(index);
-        }
-
-        function checkDocument(index) {
-            const checkbox = document.getElementById(`doc-${index}`);
-            const item = checkbox.closest('.document-item');
-            
-            if (checkbox.checked) {
-                item.classList.add('checked');
-            } else {
-                item.classList.remove('checked');
-            }
-            
-            validateForm();
-        }
+# PyMuPDF does not support multithreaded use, and analyses run on several
+# background threads - every fitz call is made while holding this lock
+FITZ_LOCK = threading.Lock()
 
-        function validateForm() {
-            const checkboxes = document.querySelectorAll('#document-checklist input[type="checkbox"]');
-            const emailInput = document.getElementById('return-email');
-            const sendButton = document.getElementById('send-email-btn');
-            
-            const allChecked = Array.from(checkboxes).every(cb => cb.checked);
-            const emailValid = emailInput.value && emailInput.value.includes('@');
-            
-            sendButton.disabled = !(allChecked && emailValid);
-            
-            if (allChecked && emailValid) {
-                updateStep(3, 'completed');
-                updateStep(4, 'active');
-            }
-        }
-
-        async function compilePackage() {
-            try {
-                showAlert('Compiling package...', 'info');
-                
-                const formData = new FormData();
-                formData.append('file', uploadedFile);
-                formData.append('requirements', JSON.stringify(extractedRequirements));
-                
-                const response = await fetch('/compile_package', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                if (response.ok) {
-                    const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = 'compiled_mortgage_package.pdf';
-                    a.click();
-                    
-                    showAlert('Package compiled successfully! Download started.', 'success');
-                    updateStep(4, 'completed');
-                } else {
-                    throw new Error('Failed to compile package');
-                }
-                
-            } catch (error) {
-                console.error('Compilation error:', error);
-                showAlert('Error compiling package: ' + error.message, 'error');
-            }
-        }
-
-        async function sendEmail() {
-            try {
-                showAlert('Compiling and sending package...', 'info');
-                
-                const emailAddress = document.getElementById('return-email').value;
-                
-                const formData = new FormData();
-                formData.append('file', uploadedFile);
-                formData.append('requirements', JSON.stringify(extractedRequirements));
-                formData.append('email', emailAddress);
-                
-                const response = await fetch('/compile_and_send', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    showAlert(`Package compiled and sent successfully to ${emailAddress}!`, 'success');
-                    updateStep(4, 'completed');
-                } else {
-                    throw new Error(result.error || 'Failed to send email');
-                }
-                
-            } catch (error) {
-                console.error('Email error:', error);
-                showAlert('Error sending email: ' + error.message, 'error');
-            }
-        }
-
-        function showAlert(message, type) {
-            // Remove existing alerts
-            document.querySelectorAll('.alert').forEach(alert => alert.remove());
-            
-            const alertDiv = document.createElement('div');
-            alertDiv.className = `alert alert-${type}`;
-            alertDiv.innerHTML = message;
-            
-            const processingSection = document.getElementById('processing-section');
-            processingSection.insertBefore(alertDiv, processingSection.firstChild);
-            
-            // Auto-remove after 5 seconds for non-success messages
-            if (type !== 'success') {
-                setTimeout(() => {
-                    alertDiv.remove();
-                }, 5000);
-            }
-        }
-
-        // Initialize
-        document.addEventListener('DOMContentLoaded', function() {
-            setupFileUpload();
-            console.log('🏠 Enhanced Mortgage Package Processor with Page Preview Initialized');
-        });
-    </script>
-</body>
-</html>
-"""
+@contextlib.contextmanager
+def open_fitz_document(pdf_path):
+    """PyMuPDF document whose open and close happen under FITZ_LOCK"""
+    with FITZ_LOCK:
+        doc = fitz.open(pdf_path)
+    try:
+        yield doc
+    finally:
+        with FITZ_LOCK:
+            doc.close()
+
+# Funding instruction patterns, compiled once at import, in priority order
+EMAIL_ADDRESS = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+EMAIL_PATTERNS = [
+    re.compile(r'return.*?to[:\s]+' + EMAIL_ADDRESS, re.IGNORECASE),
+    re.compile(r'send.*?to[:\s]+' + EMAIL_ADDRESS, re.IGNORECASE),
+    re.compile(r'from[:\s]+' + EMAIL_ADDRESS, re.IGNORECASE),
+    re.compile(EMAIL_ADDRESS, re.IGNORECASE)
+]
+
+# Any checkbox glyph starts an item, which runs to the end of the line or the next glyph
+CHECKLIST_PATTERN = re.compile(r'[☐□✓]\s*(.+?)(?=\n|[☐□✓]|$)', re.MULTILINE)
+MAX_REQUIREMENTS = 100
+
+# Checklist used when no funding instructions page can be read
+STANDARD_REQUIREMENTS = (
+    "Closing Instructions (signed/dated)",
+    "Loan Application (1003)",
+    "HELOC Agreement",
+    "Notice of Right to Cancel",
+    "Mortgage/Deed",
+    "Settlement Statement/HUD",
+    "Supporting Documents"
+)
+
+class IndicatorMatcher:
+    """Finds which of a fixed set of lowercase phrases occur in a text in a single pass"""
+    
+    def __init__(self, phrases):
+        phrases = set(phrases)
+        
+        if ahocorasick:
+            self.automaton = ahocorasick.Automaton()
+            for phrase in phrases:
+                self.automaton.add_word(phrase, phrase)
+            self.automaton.make_automaton()
+        else:
+            # Regex fallback: a lookahead tries every start position, longest phrase first.
+            # Shorter phrases hidden inside a longer match are added back via contained_in.
+            self.automaton = None
+            alternation = '|'.join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+            self.pattern = re.compile(f'(?=({alternation}))')
+            self.contained_in = {p: {q for q in phrases if q in p} for p in phrases}
+    
+    def find(self, text_lower):
+        """Set of phrases present in already-lowercased text"""
+        if self.automaton is not None:
+            return {phrase for _, phrase in self.automaton.iter(text_lower)}
+        
+        found = set()
+        for match in self.pattern.finditer(text_lower):
+            found |= self.contained_in[match.group(1)]
+        return found
 
 class IntelligentMortgageProcessor:
     def __init__(self):
@@ -1128,49 +434,77 @@ class IntelligentMortgageProcessor:
             'entire executed closing package', 'complete signed closing package',
             'entire closing package', 'complete package including all pages'
         ]
+        
+        # Every indicator list is matched against a page in one scan
+        self.indicator_matcher = IndicatorMatcher(
+            self.shipping_indicators + self.email_indicators +
+            self.funding_instruction_indicators + self.complete_package_indicators
+        )
 
-    def extract_page_text(self, pdf_path, page_num):
-        """Extract text from a specific page"""
-        text_content = ""
+    def find_indicators(self, text_content):
+        """All indicator phrases present on a page"""
+        return self.indicator_matcher.find(text_content.lower())
+
+    def iter_pages_text(self, pdf_path, page_numbers):
+        """Yield (page_num, text) in page order as each page group finishes extracting,
+        so callers can analyze early pages while later groups are still being parsed"""
+        page_numbers = list(page_numbers)
+        if len(page_numbers) < max(2, PARALLEL_MIN_PAGES) or PAGE_WORKERS < 2:
+            yield from iter_pages_text_serial(pdf_path, page_numbers)
+            return
         
+        # One contiguous group per worker so each process opens the PDF once
+        group_size = -(-len(page_numbers) // PAGE_WORKERS)
+        groups = [page_numbers[i:i + group_size] for i in range(0, len(page_numbers), group_size)]
+        executor = get_page_executor()
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                if page_num < len(pdf_reader.pages):
-                    page_text = pdf_reader.pages[page_num].extract_text()
-                    if page_text.strip():
-                        text_content += page_text
-        except:
-            pass
+            futures = [executor.submit(extract_pages_text_batch, pdf_path, group) for group in groups]
+        except BrokenProcessPool:
+            # A child was killed (e.g. out of memory) on an earlier job - the pool
+            # refuses all further work, so replace it and extract this job in-process
+            app.logger.warning("Page extraction pool is broken, restarting it")
+            discard_page_executor(executor)
+            yield from iter_pages_text_serial(pdf_path, page_numbers)
+            return
         
-        if not text_content.strip():
+        for group, future in zip(groups, futures):
             try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    if page_num < len(pdf.pages):
-                        page_text = pdf.pages[page_num].extract_text()
-                        if page_text and page_text.strip():
-                            text_content = page_text
-            except:
-                pass
+                group_texts = future.result()
+            except Exception as e:
+                app.logger.exception("Parallel page extraction failed for %s", pdf_path)
+                if isinstance(e, BrokenProcessPool):
+                    discard_page_executor(executor)
+                group_texts = extract_pages_text_batch(pdf_path, group)
+            yield from group_texts.items()
+
+    def convert_page_to_image(self, pdf_path, page_num, doc=None):
+        """Convert a specific PDF page to image and return as base64.
         
-        return text_content
-
-    def convert_page_to_image(self, pdf_path, page_num):
-        """Convert a specific PDF page to image and return as base64"""
+        Pass an already open PyMuPDF document as doc to render from it directly.
+        """
         try:
             # Method 1: Using PyMuPDF (fitz)
-            doc = fitz.open(pdf_path)
-            if page_num < len(doc):
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-                img_data = pix.tobytes("png")
-                doc.close()
+            img_data = None
+            with FITZ_LOCK:
+                owns_doc = doc is None
+                if owns_doc:
+                    doc = fitz.open(pdf_path)
+                try:
+                    if page_num < len(doc):
+                        page = doc.load_page(page_num)
+                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
+                        img_data = pix.tobytes("png")
+                finally:
+                    if owns_doc:
+                        doc.close()
+            if img_data:
                 return base64.b64encode(img_data).decode('utf-8')
         except Exception as e:
             print(f"PyMuPDF conversion failed: {e}")
         
         try:
             # Method 2: Using pdf2image as fallback
+            from pdf2image import convert_from_path
             images = convert_from_path(pdf_path, first_page=page_num+1, last_page=page_num+1, dpi=150)
             if images:
                 img_buffer = io.BytesIO()
@@ -1182,113 +516,92 @@ class IntelligentMortgageProcessor:
         
         return None
 
-    def get_pdf_info(self, pdf_path):
-        """Get basic PDF information"""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                return {
-                    'total_pages': len(pdf_reader.pages),
-                    'file_size': os.path.getsize(pdf_path)
-                }
-        except:
-            return {'total_pages': 0, 'file_size': 0}
-
-    def is_shipping_page(self, text_content):
+    def is_shipping_page(self, text_content, indicators=None):
         """Detect shipping/administrative pages"""
         if not text_content:
             return False
         
-        text_lower = text_content.lower()
+        indicators = indicators if indicators is not None else self.find_indicators(text_content)
         shipping_score = sum(1 for indicator in self.shipping_indicators 
-                           if indicator in text_lower)
+                           if indicator in indicators)
         return shipping_score >= 2
 
-    def is_funding_instructions_page(self, text_content):
+    def is_funding_instructions_page(self, text_content, indicators=None):
         """Detect funding instructions"""
         if not text_content:
             return False
         
-        text_lower = text_content.lower()
+        indicators = indicators if indicators is not None else self.find_indicators(text_content)
         
-        email_score = sum(1 for indicator in self.email_indicators 
-                         if indicator in text_lower)
-        funding_score = sum(1 for indicator in self.funding_instruction_indicators 
-                          if indicator in text_lower)
+        if any(indicator in indicators for indicator in self.funding_instruction_indicators):
+            return True
         
-        return email_score >= 2 or funding_score >= 1
+        email_score = sum(1 for indicator in self.email_indicators 
+                         if indicator in indicators)
+        return email_score >= 2
 
     def extract_email_address(self, text_content):
         """Extract return email address from funding instructions"""
-        email_patterns = [
-            r'return.*?to[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'send.*?to[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'from[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        ]
+        # Every pattern ends in an address - skip all of them when there is none
+        if '@' not in text_content:
+            return None
         
-        for pattern in email_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            if matches:
-                return matches[0]
+        for pattern in EMAIL_PATTERNS:
+            match = pattern.search(text_content)
+            if match:
+                return match.group(1)
         
         return None
 
-    def extract_requirements(self, text_content):
+    def extract_requirements(self, text_content, indicators=None):
         """Extract document requirements from funding instructions"""
         if not text_content:
             return []
         
         # Check if it's a complete package requirement
-        text_lower = text_content.lower()
-        complete_package_score = sum(1 for indicator in self.complete_package_indicators 
-                                   if indicator in text_lower)
-        
-        if complete_package_score >= 1:
+        indicators = indicators if indicators is not None else self.find_indicators(text_content)
+        if any(indicator in indicators for indicator in self.complete_package_indicators):
             return ["Complete Package (No specific breakdown required)"]
         
         # Extract checklist items
-        checklist_patterns = [
-            r'☐\s*(.+?)(?=\n|☐|$)',
-            r'□\s*(.+?)(?=\n|□|$)',
-            r'✓\s*(.+?)(?=\n|✓|$)'
-        ]
-        
         requirements = []
-        for pattern in checklist_patterns:
-            matches = re.findall(pattern, text_content, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
-                clean_item = match.strip()
-                if 5 < len(clean_item) < 200:
-                    requirements.append(clean_item)
+        for match in CHECKLIST_PATTERN.finditer(text_content):
+            clean_item = match.group(1).strip()
+            if 5 < len(clean_item) < 200:
+                requirements.append(clean_item)
+                if len(requirements) >= MAX_REQUIREMENTS:
+                    break
         
         return requirements
 
     def analyze_package(self, pdf_path):
         """Main analysis function with page image extraction"""
         try:
-            pdf_info = self.get_pdf_info(pdf_path)
-            
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                total_pages = len(pdf_reader.pages)
+            # One MuPDF open serves both the page count and the preview render
+            with open_fitz_document(pdf_path) as doc:
+                with FITZ_LOCK:
+                    total_pages = doc.page_count
                 
-                # Scan first 5 pages for funding instructions
-                for page_num in range(min(5, total_pages)):
-                    text_content = self.extract_page_text(pdf_path, page_num)
-                    
+                # Scan first 5 pages for funding instructions, analyzing each
+                # page while the remaining ones are still being extracted
+                scan_pages = range(min(5, total_pages))
+                
+                for page_num, text_content in self.iter_pages_text(pdf_path, scan_pages):
                     if not text_content.strip():
                         continue
                     
-                    if self.is_shipping_page(text_content):
+                    # Scan the page for indicators once and share the hits across the checks
+                    indicators = self.find_indicators(text_content)
+                    
+                    if self.is_shipping_page(text_content, indicators):
                         continue
                     
-                    if self.is_funding_instructions_page(text_content):
-                        requirements = self.extract_requirements(text_content)
+                    if self.is_funding_instructions_page(text_content, indicators):
+                        requirements = self.extract_requirements(text_content, indicators)
                         email_address = self.extract_email_address(text_content)
                         
                         # NEW: Convert page to image for preview
-                        page_image = self.convert_page_to_image(pdf_path, page_num)
+                        page_image = self.convert_page_to_image(pdf_path, page_num, doc)
                         
                         return {
                             'success': True,
@@ -1305,15 +618,7 @@ class IntelligentMortgageProcessor:
                     'success': True,
                     'page_number': None,
                     'total_pages': total_pages,
-                    'requirements': [
-                        "Closing Instructions (signed/dated)",
-                        "Loan Application (1003)",
-                        "HELOC Agreement",
-                        "Notice of Right to Cancel",
-                        "Mortgage/Deed",
-                        "Settlement Statement/HUD",
-                        "Supporting Documents"
-                    ],
+                    'requirements': list(STANDARD_REQUIREMENTS),
                     'return_email': None,
                     'instruction_type': 'detailed_checklist',
                     'note': 'Image-based PDF detected - using standard template',
@@ -1321,6 +626,7 @@ class IntelligentMortgageProcessor:
                 }
                 
         except Exception as e:
+            app.logger.exception("Package analysis failed for %s", pdf_path)
             return {
                 'success': False,
                 'error': str(e)
@@ -1329,38 +635,448 @@ class IntelligentMortgageProcessor:
 # Initialize processor
 processor = IntelligentMortgageProcessor()
 
+def open_private_file(path, mode='wb'):
+    """Create or truncate a file only this user can read - packages hold borrower data"""
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), mode)
+
+class KeyedFileStore:
+    """JSON records keyed by id, shared by every worker process through the filesystem.
+    
+    Entries (and any companion files stored under the same key) expire ttl seconds
+    after they were last written; expired files are swept out lazily on write.
+    With max_files set, every write also evicts the oldest files beyond that count.
+    """
+    
+    KEY_PATTERN = re.compile(r'[0-9a-f]{32}')
+    SWEEP_INTERVAL = 300
+    
+    def __init__(self, directory, ttl, max_files=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_files = max_files
+        self.last_sweep = 0
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+    
+    def path(self, key, suffix='.json'):
+        """File path for a key, or None if the key is not a valid id"""
+        if not self.KEY_PATTERN.fullmatch(key or ''):
+            return None
+        return os.path.join(self.directory, key + suffix)
+    
+    def set(self, key, value):
+        path = self.path(key)
+        if path is None:
+            raise ValueError(f"Invalid store key: {key!r}")
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open_private_file(temp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(temp_path, path)  # Atomic, so readers never see a partial record
+        self.sweep()
+    
+    def sweep(self):
+        """Remove files not written to within the TTL, at most once per interval,
+        and the oldest files beyond max_files on every call"""
+        now = time.time()
+        if self.max_files is None and now - self.last_sweep < self.SWEEP_INTERVAL:
+            return
+        self.last_sweep = now
+        
+        kept = []
+        for entry in os.scandir(self.directory):
+            try:
+                mtime = entry.stat().st_mtime
+                if now - mtime > self.ttl:
+                    os.remove(entry.path)
+                elif not entry.name.endswith('.tmp'):  # Never evict another writer's file mid-write
+                    kept.append((mtime, entry.path))
+            except FileNotFoundError:
+                pass
+        
+        if self.max_files is not None and len(kept) > self.max_files:
+            kept.sort()
+            for _, path in kept[:-self.max_files]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+    
+    def touch(self, key):
+        """Restart an entry's TTL without rewriting it"""
+        path = self.path(key)
+        if path is None:
+            return
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+    
+    def get(self, key):
+        path = self.path(key)
+        if path is None:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def pop(self, key):
+        value = self.get(key)
+        if value is not None:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                return None
+        return value
+
+class LRUCache:
+    """Small thread-safe in-process LRU map"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+    
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+# Root for uploads, job scratch copies and cached results. Point SCRATCH_DIR at a
+# tmpfs such as /dev/shm to keep package I/O off the disk when memory allows.
+SCRATCH_DIR = os.environ.get('SCRATCH_DIR', tempfile.gettempdir())
+
+# Resumable chunked uploads - bytes land on disk as they arrive
+upload_store = KeyedFileStore(os.path.join(SCRATCH_DIR, 'mortgage_uploads'), ttl=6 * 3600)
+
+# Background analysis jobs - keeps request workers free while PDFs are scanned
+analysis_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('ANALYSIS_WORKERS', 2)))
+# The executor queue itself is unbounded, and every waiting job holds a package on
+# disk - cap queued plus running jobs per process and turn the rest away
+MAX_PENDING_JOBS = int(os.environ.get('MAX_PENDING_JOBS', 16))
+analysis_slots = threading.BoundedSemaphore(MAX_PENDING_JOBS)
+job_store = KeyedFileStore(os.path.join(SCRATCH_DIR, 'mortgage_jobs'), ttl=3600)
+
+# Analysis results keyed by package content, so re-uploaded packages skip the scan.
+# Results carry an image of the funding page (borrower names, amounts), so they are
+# kept no longer than a job and capped in number - SCRATCH_DIR may be a tmpfs.
+result_store = KeyedFileStore(
+    os.path.join(SCRATCH_DIR, 'mortgage_results'),
+    ttl=3600,
+    max_files=int(os.environ.get('RESULT_STORE_MAX_FILES', 32))
+)
+# Hot results stay decoded in memory - each carries a base64 page image, so the
+# on-disk JSON is large and costly to re-read and parse on every repeat upload
+recent_results = LRUCache(maxsize=int(os.environ.get('RESULT_CACHE_SIZE', 16)))
+
+def get_cached_result(content_digest):
+    """Previous analysis of identical content, from memory or the shared store"""
+    result = recent_results.get(content_digest)
+    if result is None:
+        result = result_store.get(content_digest)
+        if result is not None:
+            recent_results.set(content_digest, result)
+    return result
+
+def cache_result(content_digest, result):
+    """Remember a successful analysis in memory and in the shared store"""
+    recent_results.set(content_digest, result)
+    result_store.set(content_digest, result)
+
+
+DIGEST_BLOCK_SIZE = 1024 * 1024
+
+def new_content_digest():
+    """128-bit BLAKE2b - fast in software and sized to fit KeyedFileStore ids"""
+    return hashlib.blake2b(digest_size=16)
+
+def file_digest(path):
+    """Content digest of a file already on disk"""
+    digest = new_content_digest()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def save_upload_with_digest(file, path):
+    """Write an uploaded file to disk, hashing it in the same pass"""
+    digest = new_content_digest()
+    with open_private_file(path) as out:
+        for block in iter(lambda: file.stream.read(DIGEST_BLOCK_SIZE), b''):
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+# Readers accept the %PDF- marker anywhere in the first 1024 bytes
+PDF_MAGIC = b'%PDF-'
+PDF_HEADER_WINDOW = 1024
+
+def is_pdf_filename(filename):
+    return filename.lower().endswith('.pdf')
+
+def has_pdf_header(data):
+    return PDF_MAGIC in data[:PDF_HEADER_WINDOW]
+
+# Werkzeug keeps uploads up to this size in memory rather than spooling them to disk
+IN_MEMORY_UPLOAD_SIZE = 500 * 1024
+
+def open_upload_for_response(file):
+    """Readable handle on an upload that outlives the request.
+    
+    Flask closes request files before the response body is sent, so a disk-backed
+    upload is re-opened through a duplicated descriptor - the server can then
+    sendfile it instead of the whole package being copied into a BytesIO.
+    Small uploads Werkzeug kept in memory are cheap to copy.
+    """
+    # Asking an in-memory spooled file for fileno() would write it to disk first
+    size = file.stream.seek(0, os.SEEK_END)
+    file.stream.seek(0)
+    if size <= IN_MEMORY_UPLOAD_SIZE:
+        return io.BytesIO(file.read())
+    
+    try:
+        fd = os.dup(file.stream.fileno())
+    except (AttributeError, io.UnsupportedOperation):
+        return io.BytesIO(file.read())
+    
+    stream = os.fdopen(fd, 'rb')
+    stream.seek(0)
+    return stream
+
+def run_analysis_job(job_id, temp_path, content_digest):
+    """Run package analysis in the background and record the result"""
+    job_store.set(job_id, {'status': 'processing', 'result': None})
+    
+    # analyze_package reports its own failures as success=False results
+    try:
+        result = processor.analyze_package(temp_path)
+    finally:
+        # Clean up
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    # Successful results live once, in the result cache - the job only points at them
+    if result.get('success'):
+        cache_result(content_digest, result)
+        job_store.set(job_id, {'status': 'complete', 'digest': content_digest})
+    else:
+        job_store.set(job_id, {'status': 'failed', 'result': result})
+
+def record_job_crash(job_id, future):
+    """Mark a job failed when run_analysis_job itself raised (e.g. the disk filled
+    up while saving the result), instead of leaving it 'processing' until it expires"""
+    if future.cancelled() or future.exception() is None:
+        return
+    
+    error = future.exception()
+    app.logger.error("Analysis job %s crashed", job_id, exc_info=error)
+    try:
+        job_store.set(job_id, {'status': 'failed', 'result': {'success': False, 'error': str(error)}})
+    except Exception:
+        app.logger.exception("Could not record failure of analysis job %s", job_id)
+
+@app.before_request
+def serve_precompressed_asset():
+    """Answer versioned CSS/JS requests with the encodings built at startup"""
+    prefix = app.static_url_path + '/'
+    if not request.path.startswith(prefix) or request.args.get('v') != ASSET_VERSION:
+        return None
+    
+    asset = request.path[len(prefix):]
+    if asset not in STATIC_GZIP:
+        return None
+    
+    if STATIC_BR and request.accept_encodings['br']:
+        body, encoding = STATIC_BR[asset], 'br'
+    elif request.accept_encodings['gzip']:
+        body, encoding = STATIC_GZIP[asset], 'gzip'
+    else:
+        return None  # Identity - let the static view send the file as usual
+    
+    return Response(body, mimetype=STATIC_ASSETS[asset], headers={'Content-Encoding': encoding})
+
+@app.after_request
+def mark_versioned_assets_immutable(response):
+    """Versioned static URLs never change content, so browsers can skip revalidation"""
+    if request.path.startswith(app.static_url_path + '/') and request.args.get('v') == ASSET_VERSION:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_ASSET_MAX_AGE
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
     """Main dashboard"""
-    return render_template_string(HTML_TEMPLATE)
+    # The shell is tiny and names versioned assets, so always revalidate it via the ETag
+    headers = {'ETag': f'"{INDEX_ETAG}"', 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    
+    if INDEX_ETAG in request.if_none_match:
+        return Response(status=304, headers=headers)
+    
+    # Serve the precompressed bytes the client accepts
+    if INDEX_BR and request.accept_encodings['br']:
+        body = INDEX_BR
+        headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        body = INDEX_GZIP
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        body = INDEX_HTML
+    
+    return Response(body, mimetype='text/html', headers=headers)
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable chunked upload"""
+    try:
+        filename = secure_filename(request.form.get('filename', ''))
+        size = int(request.form.get('size', 0))
+        
+        if not filename:
+            return jsonify({'success': False, 'error': 'No file selected'})
+        if not is_pdf_filename(filename):
+            return jsonify({'success': False, 'error': 'Only PDF files are supported'})
+        if size <= 0 or size > app.config['MAX_CONTENT_LENGTH']:
+            return jsonify({'success': False, 'error': 'Invalid file size'})
+        
+        upload_id = uuid.uuid4().hex
+        upload_path = upload_store.path(upload_id, '.part')
+        open_private_file(upload_path).close()
+        upload_store.set(upload_id, {'filename': filename, 'size': size, 'path': upload_path})
+        
+        return jsonify({'success': True, 'upload_id': upload_id, 'offset': 0})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/uploads/<upload_id>', methods=['GET', 'PATCH'])
+def upload_chunk(upload_id):
+    """Report the committed offset of an upload, or append the next chunk"""
+    try:
+        upload = upload_store.get(upload_id)
+        if upload is None:
+            return jsonify({'success': False, 'error': 'Unknown upload'}), 404
+        
+        if request.method == 'GET':
+            return jsonify({'success': True, 'offset': os.path.getsize(upload['path'])})
+        
+        chunk = request.get_data(cache=False)
+        
+        # Lock the data file so appends from different workers cannot interleave
+        with open(upload['path'], 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            offset = f.seek(0, os.SEEK_END)
+            
+            # Chunks must continue exactly where the last committed one ended
+            if int(request.headers.get('Upload-Offset', -1)) != offset:
+                return jsonify({'success': False, 'error': 'Offset mismatch', 'offset': offset}), 409
+            if offset + len(chunk) > upload['size']:
+                return jsonify({'success': False, 'error': 'Chunk exceeds declared size'}), 400
+            if offset == 0 and not has_pdf_header(chunk):
+                return jsonify({'success': False, 'error': 'Not a PDF file'}), 400
+            
+            f.write(chunk)
+        
+        return jsonify({'success': True, 'offset': offset + len(chunk)})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/analyze_package', methods=['POST'])
 def analyze_package():
     """Analyze uploaded mortgage package"""
+    if not analysis_slots.acquire(blocking=False):
+        return jsonify({'success': False, 'error': 'Server busy analyzing other packages - please try again shortly'}), 503
+    
+    queued = False
     try:
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'No file uploaded'})
+        job_id = uuid.uuid4().hex
+        upload_id = request.form.get('upload_id')
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'})
+        if upload_id:
+            # Take over a completed chunked upload without re-buffering it
+            upload = upload_store.get(upload_id)
+            if upload is None:
+                return jsonify({'success': False, 'error': 'Unknown upload'})
+            if os.path.getsize(upload['path']) != upload['size']:
+                return jsonify({'success': False, 'error': 'Upload incomplete'})
+            upload_store.pop(upload_id)
+            
+            temp_path = job_store.path(job_id, '.pdf')
+            os.replace(upload['path'], temp_path)
+            content_digest = file_digest(temp_path)
+        else:
+            if 'file' not in request.files:
+                return jsonify({'success': False, 'error': 'No file uploaded'})
+            
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': 'No file selected'})
+            
+            # Reject non-PDFs before anything touches the disk
+            if not is_pdf_filename(file.filename):
+                return jsonify({'success': False, 'error': 'Only PDF files are supported'})
+            header = file.stream.read(PDF_HEADER_WINDOW)
+            file.stream.seek(0)
+            if not has_pdf_header(header):
+                return jsonify({'success': False, 'error': 'Not a PDF file'})
+            
+            # Save uploaded file temporarily under a per-job name
+            temp_path = job_store.path(job_id, '.pdf')
+            content_digest = save_upload_with_digest(file, temp_path)
         
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(tempfile.gettempdir(), filename)
-        file.save(temp_path)
+        # Identical package analyzed before - answer from the result cache
+        cached_result = get_cached_result(content_digest)
+        if cached_result is not None:
+            os.remove(temp_path)
+            result_store.touch(content_digest)  # Keep the result for as long as this job
+            job_store.set(job_id, {'status': 'complete', 'digest': content_digest})
+            return jsonify({'success': True, 'job_id': job_id, 'status': 'complete'})
         
-        try:
-            # Analyze the package
-            result = processor.analyze_package(temp_path)
-            return jsonify(result)
-        finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        # Queue the analysis and return immediately
+        job_store.set(job_id, {'status': 'queued', 'result': None})
+        future = analysis_executor.submit(run_analysis_job, job_id, temp_path, content_digest)
+        future.add_done_callback(functools.partial(record_job_crash, job_id))
+        future.add_done_callback(lambda _: analysis_slots.release())
+        queued = True
+        
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'queued'})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
+    finally:
+        # The slot is only held for as long as a job sits in the executor
+        if not queued:
+            analysis_slots.release()
+
+@app.route('/analyze_package/status/<job_id>')
+def analyze_package_status(job_id):
+    """Report the state of a queued package analysis"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    
+    # Finished jobs stay readable until the store's TTL sweeps them, so a
+    # poll response lost in transit can simply be asked for again
+    result = job.get('result')
+    if 'digest' in job:
+        result = get_cached_result(job['digest'])
+        if result is None:
+            return jsonify({'success': False, 'error': 'Analysis result expired - please upload the package again'}), 404
+    
+    return jsonify({'success': True, 'job_id': job_id, 'status': job['status'], 'result': result})
 
 @app.route('/compile_package', methods=['POST'])
 def compile_package():
@@ -1375,12 +1091,17 @@ def compile_package():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_filename = f"compiled_mortgage_package_{timestamp}.pdf"
         
-        return send_file(
-            io.BytesIO(file.read()),
+        response = send_file(
+            open_upload_for_response(file),
             as_attachment=True,
             download_name=output_filename,
-            mimetype='application/pdf'
+            mimetype='application/pdf',
+            max_age=0
         )
+        # A borrower's package must never sit in a browser or proxy cache
+        response.cache_control.no_store = True
+        response.cache_control.private = True
+        return response
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -0,0 +1,21 @@
+# Gunicorn configuration for the Mortgage Package Processor
+# Loaded automatically by `gunicorn app:app` from the project root
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Threaded workers: uploads, chunk appends and status polls are I/O-bound and
+# overlap on threads, while PDF parsing runs on the app's background analysis
+# threads (and in its page process pool when PAGE_WORKERS is set).
+# Job and upload state lives on disk, so any worker can answer any request.
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Keep worker heartbeat files off the disk
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Restart a worker whose main loop stops checking in for this long. With gthread
+# workers this is a liveness heartbeat, not a limit on how long a request may take
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
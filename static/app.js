@@ -0,0 +1,538 @@
+// Global state
+let uploadedFile = null;
+let extractedRequirements = null;
+let currentStep = 1;
+
+// Elements looked up once at startup instead of on every call
+const DOM = {};
+
+function cacheDomElements() {
+    Object.assign(DOM, {
+        actionButtons: document.getElementById('action-buttons'),
+        documentChecklist: document.getElementById('document-checklist'),
+        emailSection: document.getElementById('email-section'),
+        fileInput: document.getElementById('file-input'),
+        fileName: document.getElementById('file-name'),
+        fileSize: document.getElementById('file-size'),
+        instructionsFound: document.getElementById('instructions-found'),
+        loadingText: document.getElementById('loading-text'),
+        modalImage: document.getElementById('modal-image'),
+        packagePreview: document.getElementById('package-preview'),
+        pageModal: document.getElementById('page-modal'),
+        prioritySections: document.getElementById('priority-sections'),
+        processingLoading: document.getElementById('processing-loading'),
+        processingSection: document.getElementById('processing-section'),
+        requirementPageImage: document.getElementById('requirement-page-image'),
+        requirementPageNumber: document.getElementById('requirement-page-number'),
+        requirementPagePreview: document.getElementById('requirement-page-preview'),
+        returnEmail: document.getElementById('return-email'),
+        sendEmailBtn: document.getElementById('send-email-btn'),
+        totalPages: document.getElementById('total-pages'),
+        uploadArea: document.getElementById('upload-area'),
+        uploadSection: document.getElementById('upload-section'),
+        steps: [1, 2, 3, 4].map(n => document.getElementById(`step-${n}`))
+    });
+}
+
+// File upload handling
+function setupFileUpload() {
+    const uploadArea = DOM.uploadArea;
+    const fileInput = DOM.fileInput;
+
+    // Drag and drop
+    uploadArea.addEventListener('dragover', (e) => {
+        e.preventDefault();
+        uploadArea.classList.add('dragover');
+    });
+
+    uploadArea.addEventListener('dragleave', () => {
+        uploadArea.classList.remove('dragover');
+    });
+
+    uploadArea.addEventListener('drop', (e) => {
+        e.preventDefault();
+        uploadArea.classList.remove('dragover');
+        const files = e.dataTransfer.files;
+        if (files.length > 0) {
+            handleFile(files[0]);
+        }
+    });
+}
+
+function handleFileUpload(event) {
+    const file = event.target.files[0];
+    if (file) {
+        handleFile(file);
+    }
+}
+
+function handleFile(file) {
+    if (file.type !== 'application/pdf') {
+        alert('Please upload a PDF file.');
+        return;
+    }
+
+    uploadedFile = file;
+    
+    // Update package preview
+    updatePackagePreview(file);
+    
+    // Hide upload section and show processing
+    DOM.uploadSection.style.display = 'none';
+    DOM.processingSection.style.display = 'block';
+    
+    // Start processing
+    processPackage();
+}
+
+function updatePackagePreview(file) {
+    DOM.fileName.textContent = file.name;
+    DOM.fileSize.textContent = formatFileSize(file.size);
+    DOM.packagePreview.style.display = 'block';
+}
+
+// Size units lookup, built once instead of per call
+const FILE_SIZE_UNITS = Object.freeze(['Bytes', 'KB', 'MB', 'GB']);
+const LOG_1024 = Math.log(1024);
+
+function formatFileSize(bytes) {
+    if (bytes === 0) return '0 Bytes';
+    const i = Math.min(Math.floor(Math.log(bytes) / LOG_1024), FILE_SIZE_UNITS.length - 1);
+    return parseFloat((bytes / Math.pow(1024, i)).toFixed(2)) + ' ' + FILE_SIZE_UNITS[i];
+}
+
+async function processPackage() {
+    try {
+        // Step 1: Scan Package
+        updateStep(1, 'active');
+        DOM.processingLoading.style.display = 'block';
+        
+        // Upload file in resumable chunks, then analyze it
+        const loadingText = DOM.loadingText;
+        const uploadId = await uploadInChunks(uploadedFile, (loaded, total) => {
+            loadingText.textContent = `Uploading ${formatFileSize(loaded)} / ${formatFileSize(total)}...`;
+        });
+        loadingText.textContent = 'Analyzing mortgage package...';
+        
+        const job = await queueAnalysis(uploadId);
+        loadingText.textContent = 'Analyzing mortgage package...';
+        
+        if (!job.success) {
+            throw new Error(job.error || 'Failed to queue package');
+        }
+        
+        const result = await waitForAnalysis(job.job_id);
+        
+        if (result.success) {
+            updateStep(1, 'completed');
+            updateStep(2, 'active');
+            
+            // Update package info
+            DOM.totalPages.textContent = result.total_pages || 'Unknown';
+            DOM.instructionsFound.textContent = result.page_number ? `Page ${result.page_number}` : 'Not detected';
+            
+            // NEW: Show requirement page preview if available
+            if (result.page_image) {
+                showRequirementPagePreview(result.page_image, result.page_number);
+            }
+            
+            // Step 2: Extract Requirements
+            extractedRequirements = result;
+            displayRequirements(result);
+            
+            updateStep(2, 'completed');
+            updateStep(3, 'active');
+            
+            DOM.processingLoading.style.display = 'none';
+            
+        } else {
+            throw new Error(result.error || 'Failed to analyze package');
+        }
+        
+    } catch (error) {
+        console.error('Processing error:', error);
+        DOM.processingLoading.style.display = 'none';
+        showAlert('Error processing package: ' + error.message, 'error');
+    }
+}
+
+// Send a request body via XHR so real upload progress can be shown
+function uploadWithProgress(method, url, body, headers, onProgress) {
+    return new Promise((resolve, reject) => {
+        const xhr = new XMLHttpRequest();
+        xhr.open(method, url);
+        xhr.responseType = 'json';
+        Object.entries(headers).forEach(([name, value]) => xhr.setRequestHeader(name, value));
+        
+        xhr.upload.onprogress = (e) => {
+            if (e.lengthComputable) {
+                onProgress(e.loaded, e.total);
+            }
+        };
+        xhr.onload = () => {
+            if (xhr.response) {
+                resolve(xhr.response);
+            } else {
+                reject(new Error(`Upload failed (HTTP ${xhr.status})`));
+            }
+        };
+        xhr.onerror = () => reject(new Error('Network error during upload'));
+        
+        xhr.send(body);
+    });
+}
+
+// Upload a file in fixed-size chunks; a failed chunk resumes from the
+// last offset the server committed instead of restarting from zero
+const UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 3;
+
+async function uploadInChunks(file, onProgress) {
+    const createData = new FormData();
+    createData.append('filename', file.name);
+    createData.append('size', file.size);
+    
+    const createResponse = await fetch('/uploads', { method: 'POST', body: createData });
+    const upload = await createResponse.json();
+    if (!upload.success) {
+        throw new Error(upload.error || 'Failed to start upload');
+    }
+    
+    let offset = 0;
+    let retries = 0;
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE);
+        try {
+            const result = await uploadWithProgress(
+                'PATCH', `/uploads/${upload.upload_id}`, chunk,
+                { 'Upload-Offset': offset, 'Content-Type': 'application/offset+octet-stream' },
+                (loaded) => onProgress(offset + loaded, file.size)
+            );
+            if (!result.success && result.offset === undefined) {
+                throw new Error(result.error || 'Chunk rejected');
+            }
+            offset = result.offset;
+            retries = 0;
+        } catch (error) {
+            if (++retries > UPLOAD_MAX_RETRIES) {
+                throw error;
+            }
+            // Ask the server where to resume from
+            const statusResponse = await fetch(`/uploads/${upload.upload_id}`);
+            const status = await statusResponse.json();
+            if (!status.success) {
+                throw new Error(status.error || 'Upload lost');
+            }
+            offset = status.offset;
+        }
+        onProgress(offset, file.size);
+    }
+    
+    return upload.upload_id;
+}
+
+// The server turns new jobs away (HTTP 503) while its analysis queue is full.
+// The finished upload stays on the server, so wait and ask again with backoff.
+const QUEUE_RETRY_INITIAL_DELAY = 2000;
+const QUEUE_RETRY_MAX_DELAY = 15000;
+const QUEUE_MAX_ATTEMPTS = 8;
+
+async function queueAnalysis(uploadId) {
+    let delay = QUEUE_RETRY_INITIAL_DELAY;
+    for (let attempt = 1; ; attempt++) {
+        const formData = new FormData();
+        formData.append('upload_id', uploadId);
+        
+        const response = await fetch('/analyze_package', {
+            method: 'POST',
+            body: formData
+        });
+        const job = await response.json();
+        
+        if (response.status !== 503 || attempt >= QUEUE_MAX_ATTEMPTS) {
+            return job;
+        }
+        
+        DOM.loadingText.textContent = 'Server busy - waiting to start analysis...';
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, QUEUE_RETRY_MAX_DELAY);
+    }
+}
+
+// Poll the background analysis job until it finishes. Short packages come
+// back quickly; long ones back off so the tab isn't woken every second.
+const POLL_INITIAL_DELAY = 500;
+const POLL_MAX_DELAY = 4000;
+const ANALYSIS_TIMEOUT = 10 * 60 * 1000;
+
+async function waitForAnalysis(jobId) {
+    const deadline = Date.now() + ANALYSIS_TIMEOUT;
+    let delay = POLL_INITIAL_DELAY;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, POLL_MAX_DELAY);
+        
+        let status;
+        try {
+            const response = await fetch(`/analyze_package/status/${jobId}`);
+            status = await response.json();
+        } catch (error) {
+            // A dropped poll is harmless - the server keeps the job until it expires
+            continue;
+        }
+        
+        if (!status.success) {
+            throw new Error(status.error || 'Lost track of analysis job');
+        }
+        if (status.status === 'complete' || status.status === 'failed') {
+            return status.result;
+        }
+    }
+    throw new Error('Analysis is taking too long - please try again later');
+}
+
+// NEW: Show requirement page preview
+function showRequirementPagePreview(pageImageBase64, pageNumber) {
+    const previewSection = DOM.requirementPagePreview;
+    const previewImage = DOM.requirementPageImage;
+    const pageNumberSpan = DOM.requirementPageNumber;
+    const modalImage = DOM.modalImage;
+    
+    // Set the image source
+    const imageDataUrl = `data:image/png;base64,${pageImageBase64}`;
+    previewImage.src = imageDataUrl;
+    modalImage.src = imageDataUrl;
+    
+    // Set page number
+    pageNumberSpan.textContent = pageNumber || 'Unknown';
+    
+    // Show the preview section
+    previewSection.style.display = 'block';
+}
+
+// Modal functions
+function openModal() {
+    DOM.pageModal.style.display = 'block';
+}
+
+function closeModal() {
+    DOM.pageModal.style.display = 'none';
+}
+
+// Close modal when clicking outside the content
+function setupModal() {
+    DOM.pageModal.addEventListener('click', (e) => {
+        if (e.target === e.currentTarget) {
+            closeModal();
+        }
+    });
+}
+
+function updateStep(stepNumber, status) {
+    const step = DOM.steps[stepNumber - 1];
+    step.classList.remove('active', 'completed');
+    if (status) {
+        step.classList.add(status);
+    }
+}
+
+// Requirement text comes from the uploaded PDF, so it is set as text, never parsed as HTML
+function createChecklistItem(id, text) {
+    const item = document.createElement('div');
+    item.className = 'document-item';
+    
+    const wrapper = document.createElement('div');
+    wrapper.className = 'document-checkbox';
+    
+    const checkbox = document.createElement('input');
+    checkbox.type = 'checkbox';
+    checkbox.id = id;
+    
+    const label = document.createElement('label');
+    label.htmlFor = id;
+    label.className = 'document-name';
+    label.textContent = text;
+    
+    wrapper.append(checkbox, label);
+    item.appendChild(wrapper);
+    return item;
+}
+
+function displayRequirements(result) {
+    // Show priority sections
+    const prioritySection = DOM.prioritySections;
+    const checklistContainer = DOM.documentChecklist;
+    
+    // Build every row off-document and attach them in one go
+    const fragment = document.createDocumentFragment();
+    
+    if (result.requirements && result.requirements.length > 0) {
+        result.requirements.forEach((req, index) => {
+            fragment.appendChild(createChecklistItem(`doc-${index}`, req));
+        });
+    } else {
+        fragment.appendChild(createChecklistItem('doc-complete', 'Complete Package (No specific breakdown required)'));
+    }
+    
+    checklistContainer.replaceChildren(fragment);
+    prioritySection.style.display = 'block';
+    
+    // Show email section
+    const emailSection = DOM.emailSection;
+    const emailInput = DOM.returnEmail;
+    
+    if (result.return_email) {
+        emailInput.value = result.return_email;
+    }
+    
+    emailSection.style.display = 'block';
+    
+    // Show action buttons
+    DOM.actionButtons.style.display = 'flex';
+}
+
+// Checklist rows are re-rendered per package, so handle them by delegation
+function setupChecklist() {
+    const checklistContainer = DOM.documentChecklist;
+    
+    // Clicking anywhere on a row toggles it; the checkbox and label toggle natively
+    checklistContainer.addEventListener('click', (e) => {
+        const item = e.target.closest('.document-item');
+        if (!item || e.target.closest('input, label')) return;
+        
+        const checkbox = item.querySelector('input[type="checkbox"]');
+        checkbox.checked = !checkbox.checked;
+        checkDocument(checkbox);
+    });
+    
+    checklistContainer.addEventListener('change', (e) => {
+        if (e.target.matches('input[type="checkbox"]')) {
+            checkDocument(e.target);
+        }
+    });
+}
+
+function checkDocument(checkbox) {
+    checkbox.closest('.document-item').classList.toggle('checked', checkbox.checked);
+    validateForm();
+}
+
+function validateForm() {
+    const checkboxes = DOM.documentChecklist.querySelectorAll('input[type="checkbox"]');
+    const emailInput = DOM.returnEmail;
+    const sendButton = DOM.sendEmailBtn;
+    
+    const allChecked = Array.from(checkboxes).every(cb => cb.checked);
+    const emailValid = emailInput.value && emailInput.value.includes('@');
+    
+    sendButton.disabled = !(allChecked && emailValid);
+    
+    if (allChecked && emailValid) {
+        updateStep(3, 'completed');
+        updateStep(4, 'active');
+    }
+}
+
+async function compilePackage() {
+    try {
+        showAlert('Compiling package...', 'info');
+        
+        const formData = new FormData();
+        formData.append('file', uploadedFile);
+        formData.append('requirements', JSON.stringify(extractedRequirements));
+        
+        const response = await fetch('/compile_package', {
+            method: 'POST',
+            body: formData
+        });
+        
+        if (response.ok) {
+            const blob = await response.blob();
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = 'compiled_mortgage_package.pdf';
+            a.click();
+            
+            showAlert('Package compiled successfully! Download started.', 'success');
+            updateStep(4, 'completed');
+        } else {
+            throw new Error('Failed to compile package');
+        }
+        
+    } catch (error) {
+        console.error('Compilation error:', error);
+        showAlert('Error compiling package: ' + error.message, 'error');
+    }
+}
+
+async function sendEmail() {
+    try {
+        showAlert('Compiling and sending package...', 'info');
+        
+        const emailAddress = DOM.returnEmail.value;
+        
+        const formData = new FormData();
+        formData.append('file', uploadedFile);
+        formData.append('requirements', JSON.stringify(extractedRequirements));
+        formData.append('email', emailAddress);
+        
+        const response = await fetch('/compile_and_send', {
+            method: 'POST',
+            body: formData
+        });
+        
+        const result = await response.json();
+        
+        if (result.success) {
+            showAlert(`Package compiled and sent successfully to ${emailAddress}!`, 'success');
+            updateStep(4, 'completed');
+        } else {
+            throw new Error(result.error || 'Failed to send email');
+        }
+        
+    } catch (error) {
+        console.error('Email error:', error);
+        showAlert('Error sending email: ' + error.message, 'error');
+    }
+}
+
+// Only one alert is shown at a time; keep a handle so replacing it is a single removal
+let currentAlert = null;
+let currentAlertTimer = null;
+
+function showAlert(message, type) {
+    // Remove existing alert
+    if (currentAlert) {
+        clearTimeout(currentAlertTimer);
+        currentAlert.remove();
+    }
+    
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type}`;
+    alertDiv.innerHTML = message;
+    
+    const processingSection = DOM.processingSection;
+    processingSection.insertBefore(alertDiv, processingSection.firstChild);
+    currentAlert = alertDiv;
+    
+    // Auto-remove after 5 seconds for non-success messages
+    if (type !== 'success') {
+        currentAlertTimer = setTimeout(() => {
+            alertDiv.remove();
+            if (currentAlert === alertDiv) {
+                currentAlert = null;
+            }
+        }, 5000);
+    }
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    cacheDomElements();
+    setupFileUpload();
+    DOM.returnEmail.addEventListener('input', validateForm);
+    setupChecklist();
+    setupModal();
+    console.log('🏠 Enhanced Mortgage Package Processor with Page Preview Initialized');
+});